@@ -1,14 +1,19 @@
 import unittest
 import uuid
 from collections import Counter
+import matplotlib
+matplotlib.use("Agg") # Draw off-screen in tests
+import matplotlib.pyplot as plt
 import networkx as nx
-from universe_model import Entity, Interaction, Observer, Universe, scale_distance, scale_biased_encounter_rule, gravity_rule, fusion_rule, group_formation_rule, persistent_interaction_rule
+import numpy as np
+from universe_model import Entity, Interaction, Observer, Universe, visualize_universe, scale_distance, scale_distance_vec, close_pairs, scale_biased_encounter_rule, gravity_rule, fusion_rule, group_formation_rule, persistent_interaction_rule, make_persistent_interaction_rule, scale_rule
 import universe_model # Import the module to access global variables
 
 class TestEntity(unittest.TestCase):
     def test_entity_creation(self):
         entity = Entity()
-        self.assertIsInstance(entity.id, uuid.UUID)
+        self.assertIsInstance(entity.id, int)
+        self.assertNotEqual(Entity().id, entity.id)
         self.assertEqual(entity.interaction_history, [])
         self.assertEqual(entity.local_time, 0)
         self.assertIsInstance(entity.scale, float)
@@ -16,6 +21,24 @@ class TestEntity(unittest.TestCase):
         self.assertLessEqual(entity.scale, 1.0)
         self.assertEqual(entity.properties, {})
 
+    def test_entity_bounded_history(self):
+        entity = Entity(history_size=2)
+        other = Entity()
+        interactions = [Interaction([entity, other]) for _ in range(3)]
+        for interaction in interactions:
+            interaction.record_interaction(entity)
+        self.assertEqual(list(entity.interaction_history), interactions[1:])
+        self.assertEqual(entity.local_time, 3)
+
+    def test_options_are_keyword_only(self):
+        with self.assertRaises(TypeError):
+            Entity(0.5, 16)
+        with self.assertRaises(TypeError):
+            Observer(0.5, 16)
+        observer = Observer(0.5, history_size=16)
+        self.assertEqual(observer.interaction_history.maxlen, 16)
+        self.assertIsNotNone(observer.reality_model)
+
     def test_entity_repr_with_properties(self):
         entity = Entity(scale=0.5)
         entity.properties["mass"] = 10
@@ -26,6 +49,34 @@ class TestEntity(unittest.TestCase):
         self.assertIn("mass=10", repr_str)
         self.assertIn("Group:abc", repr_str)
 
+    def test_entity_repr_refreshes_after_effects(self):
+        entity = Entity(scale=0.5)
+        other = Entity()
+        self.assertNotIn("mass=", repr(entity))
+        Interaction([entity, other], interaction_type="gravity", metadata={"mass_change": 3}).apply_effects(entity)
+        self.assertIn("mass=3", repr(entity))
+        self.assertIn("OBSERVER(", repr(Observer()))
+
+    def test_entity_repr_refreshes_after_direct_writes(self):
+        entity = Entity(scale=0.5)
+        self.assertNotIn("mass=", repr(entity))
+        entity.properties["mass"] = 10
+        self.assertIn("mass=10", repr(entity))
+        entity.properties.update(group_id="abc")
+        self.assertIn("Group:abc", repr(entity))
+        del entity.properties["mass"]
+        self.assertNotIn("mass=", repr(entity))
+        entity.properties = {"energy": 5} # A plain dict is untracked, so it is formatted every time
+        self.assertIn("energy=5", repr(entity))
+        entity.properties["energy"] = 6
+        self.assertIn("energy=6", repr(entity))
+
+    def test_entity_repr_refreshes_after_scale_change(self):
+        entity = Entity(scale=0.2)
+        self.assertIn("Scale:0.20", repr(entity))
+        entity.scale = 0.7
+        self.assertIn("Scale:0.70", repr(entity))
+
 class TestInteraction(unittest.TestCase):
     def test_interaction_creation(self):
         entity1 = Entity()
@@ -92,7 +143,8 @@ class TestObserver(unittest.TestCase):
     def test_observer_creation(self):
         observer = Observer()
         self.assertIsInstance(observer, Entity)
-        self.assertIsInstance(observer.reality_model, nx.MultiDiGraph)
+        self.assertIsInstance(observer.reality_model, nx.MultiGraph)
+        self.assertFalse(observer.reality_model.is_directed())
 
     def test_observer_perceives_signal(self):
         universe = Universe()
@@ -116,6 +168,8 @@ class TestObserver(unittest.TestCase):
         self.assertIn(observer.id, observer.reality_model.nodes)
         self.assertIn(entity1.id, observer.reality_model.nodes)
         self.assertTrue(observer.reality_model.has_edge(observer.id, entity1.id, key=interaction.id))
+        self.assertTrue(observer.reality_model.has_edge(entity1.id, observer.id, key=interaction.id))
+        self.assertEqual(observer.reality_model.number_of_edges(), 1)
         self.assertEqual(observer.reality_model.get_edge_data(observer.id, entity1.id, key=interaction.id)["type"], "test_perceive")
 
     def test_observer_finds_patterns(self):
@@ -153,6 +207,92 @@ class TestObserver(unittest.TestCase):
         self.assertIn("group2", patterns["perceived_groups"])
         self.assertEqual(patterns["perceived_groups"]["group2"], 2)
 
+    def test_observer_snapshots_changed_properties(self):
+        observer = Observer()
+        entity = Entity()
+        observer.perceive_signal(Interaction([observer, entity], interaction_type="type_A"))
+        snapshot = observer.reality_model.nodes[entity.id]["properties"]
+        observer.perceive_signal(Interaction([observer, entity], interaction_type="type_A"))
+        self.assertIs(observer.reality_model.nodes[entity.id]["properties"], snapshot)
+
+        Interaction([observer, entity], interaction_type="gravity", metadata={"mass_change": 1}).apply_effects(entity)
+        observer.perceive_signal(Interaction([observer, entity], interaction_type="type_A"))
+        self.assertEqual(observer.reality_model.nodes[entity.id]["properties"], {"mass": 1})
+        self.assertEqual(snapshot, {})
+
+    def test_observer_perceived_edge_arrays(self):
+        observer = Observer(keep_graph=False)
+        e1 = Entity()
+        e2 = Entity()
+        observer.perceive_signal(Interaction([observer, e1], interaction_type="type_A"))
+        observer.perceive_signal(Interaction([e2, observer], interaction_type="type_B"))
+        observer.perceive_signal(Interaction([observer, e1], interaction_type="type_A"))
+
+        src, dst, types = observer.perceived_edges()
+        self.assertEqual(list(src), [observer.id, e2.id, observer.id])
+        self.assertEqual(list(dst), [e1.id, observer.id, e1.id])
+        self.assertEqual([observer.perceived_types()[code] for code in types], ["type_A", "type_B", "type_A"])
+
+        node_ids, indptr, neighbors = observer.perceived_adjacency()
+        adjacency = {node_ids[k]: sorted(node_ids[neighbors[indptr[k]:indptr[k + 1]]]) for k in range(len(node_ids))}
+        self.assertEqual(adjacency, {observer.id: sorted([e1.id, e2.id, e1.id]),
+                                     e1.id: [observer.id, observer.id],
+                                     e2.id: [observer.id]})
+
+    @unittest.skipIf(universe_model.igraph is None, "python-igraph is not installed")
+    def test_observer_to_igraph(self):
+        observer = Observer(keep_graph=False)
+        e1 = Entity()
+        e2 = Entity()
+        observer.perceive_signal(Interaction([observer, e1], interaction_type="type_A"))
+        observer.perceive_signal(Interaction([observer, e2], interaction_type="type_B"))
+        graph = observer.to_igraph()
+        self.assertEqual(graph.vcount(), 3)
+        self.assertEqual(graph.es["type"], ["type_A", "type_B"])
+        self.assertEqual(graph.degree(graph.vs.find(entity_id=observer.id).index), 2)
+
+    def test_observer_forgets_emptied_groups(self):
+        observer = Observer()
+        entity = Entity()
+        entity.properties["group_id"] = "old"
+        observer.perceive_signal(Interaction([observer, entity], interaction_type="type_A"))
+        entity.properties["group_id"] = "new"
+        observer.perceive_signal(Interaction([observer, entity], interaction_type="type_A"))
+        self.assertEqual(dict(observer._group_counter), {"new": 1})
+
+    def test_observer_snapshots_direct_property_writes(self):
+        observer = Observer()
+        entity = Entity()
+        observer.perceive_signal(Interaction([observer, entity], interaction_type="type_A"))
+        entity.properties["group_id"] = "g"
+        observer.perceive_signal(Interaction([observer, entity], interaction_type="type_A"))
+        self.assertEqual(observer.reality_model.nodes[entity.id]["properties"], {"group_id": "g"})
+        self.assertEqual(observer._node_groups[entity.id], "g")
+
+        entity.properties = {"group_id": "h"} # Untracked plain dict
+        observer.perceive_signal(Interaction([observer, entity], interaction_type="type_A"))
+        entity.properties["group_id"] = "i"
+        observer.perceive_signal(Interaction([observer, entity], interaction_type="type_A"))
+        self.assertEqual(observer.reality_model.nodes[entity.id]["properties"], {"group_id": "i"})
+
+    def test_observer_without_graph_finds_patterns(self):
+        observer = Observer(keep_graph=False)
+        e1 = Entity()
+        e2 = Entity()
+        e1.properties["group_id"] = "group1"
+        e2.properties["group_id"] = "group1"
+        observer.perceive_signal(Interaction([observer, e1], interaction_type="type_A"))
+        observer.perceive_signal(Interaction([observer, e2], interaction_type="type_A"))
+
+        self.assertIsNone(observer.reality_model)
+        patterns = observer.find_patterns()
+        self.assertEqual(patterns["num_perceived_entities"], 3)
+        self.assertEqual(patterns["num_perceived_relationships"], 4)
+        self.assertEqual(patterns["most_frequent_interactions"], [("type_A", 4)])
+        self.assertEqual(patterns["highly_connected_entities"][0], (observer.id, 2.0))
+        self.assertEqual(patterns["num_perceived_clusters"], 1)
+        self.assertEqual(patterns["perceived_groups"], {"group1": 2})
+
 class TestUniverse(unittest.TestCase):
     def setUp(self):
         # Reset global variables before each test that uses persistent_interaction_rule
@@ -188,12 +328,124 @@ class TestUniverse(unittest.TestCase):
         self.assertEqual(len(new_interactions), 1)
         self.assertEqual(new_interactions[0].interaction_type, "gravity")
 
+    def test_tick_skips_rules_below_min_entities(self):
+        universe = Universe()
+        universe.add_entity(Entity())
+        calls = []
+        def pair_rule(entities):
+            calls.append("pair")
+            return []
+        def solo_rule(entities):
+            calls.append("solo")
+            return []
+        universe.add_interaction_rule(pair_rule)
+        universe.add_interaction_rule(solo_rule, min_entities=1)
+        self.assertEqual(universe.tick(), [])
+        self.assertEqual(calls, ["solo"])
+
+        universe.add_entity(Entity())
+        universe.tick()
+        self.assertEqual(calls, ["solo", "pair", "solo"])
+
+    def test_interaction_history_is_a_list_by_default(self):
+        universe = Universe()
+        universe.add_entity(Entity())
+        universe.add_entity(Entity())
+        universe.add_interaction_rule(gravity_rule)
+        generated = []
+        for _ in range(3):
+            generated.extend(universe.tick())
+        self.assertIsInstance(universe.interaction_history, list)
+        self.assertEqual(universe.interaction_history[-2:], generated[-2:])
+
+    def test_bounded_interaction_history(self):
+        universe = Universe(history_size=3)
+        universe.add_entity(Entity())
+        universe.add_entity(Entity())
+        universe.add_interaction_rule(gravity_rule)
+        generated = []
+        for _ in range(5):
+            generated.extend(universe.tick())
+        self.assertEqual(list(universe.interaction_history), generated[-3:])
+        self.assertTrue(universe.has_interaction_type("gravity"))
+
+    def test_property_columns_with_shared_entity(self):
+        first = Universe()
+        second = Universe()
+        shared = Entity()
+        other = Entity()
+        first.add_entity(shared)
+        first.add_entity(other)
+        second.add_entity(Entity())
+        second.add_entity(shared) # A different row in the second universe
+        first.add_interaction_rule(gravity_rule)
+        for _ in range(3):
+            first.tick()
+        self.assertEqual(list(first.property_column("mass")), [shared.properties.get("mass", 0), other.properties.get("mass", 0)])
+        self.assertEqual(list(second.property_column("mass")), [0, 0]) # Only first's tick writes first's column
+
+    def test_visualize_universe_extends_graph(self):
+        for history_size in (None, 2):
+            universe = Universe(history_size=history_size)
+            for _ in range(4):
+                universe.add_entity(Entity())
+            universe.add_interaction_rule(gravity_rule)
+            expected = set()
+            for _ in range(3):
+                for _ in range(3):
+                    universe.tick()
+                # The drawn graph gains the edges of whatever history is kept at each call.
+                expected |= {frozenset(p.id for p in i.participants) for i in universe.interaction_history}
+                visualize_universe(universe, 0)
+                plt.close("all")
+                graph = universe._view_graph
+                self.assertEqual(list(graph.nodes), [entity.id for entity in universe.entities])
+                self.assertEqual({frozenset(edge) for edge in graph.edges}, expected)
+            self.assertEqual(universe._visualized_through, 9)
+
+    def test_visualize_universe_starting_empty(self):
+        universe = Universe()
+        visualize_universe(universe, 0)
+        universe.add_entity(Entity())
+        universe.add_entity(Entity())
+        visualize_universe(universe, 1)
+        plt.close("all")
+        self.assertEqual(set(universe._layout), {entity.id for entity in universe.entities})
+
+    def test_property_columns_follow_effects(self):
+        universe = Universe()
+        entities = [Entity() for _ in range(4)]
+        entities[0].properties["mass"] = 7
+        for entity in entities:
+            universe.add_entity(entity)
+        universe.add_interaction_rule(gravity_rule)
+        for _ in range(5):
+            universe.tick()
+        self.assertEqual(list(universe.property_column("mass")),
+                         [entity.properties.get("mass", 0) for entity in entities])
+        self.assertEqual(list(universe.property_column("energy")), [0, 0, 0, 0])
+
     def test_scale_distance(self):
         self.assertAlmostEqual(scale_distance(0.1, 0.9), 0.2) 
         self.assertAlmostEqual(scale_distance(0.1, 0.2), 0.1)
         self.assertAlmostEqual(scale_distance(0.0, 1.0), 0.0)
         self.assertAlmostEqual(scale_distance(0.0, 0.5), 0.5)
 
+    def test_scale_distance_vec(self):
+        scales = np.array([0.1, 0.2, 0.9, 0.5])
+        dists = scale_distance_vec(scales)
+        self.assertEqual(dists.shape, (4, 4))
+        for i, a in enumerate(scales):
+            for j, b in enumerate(scales):
+                self.assertAlmostEqual(dists[i, j], scale_distance(a, b))
+
+    def test_close_pairs(self):
+        scales = np.linspace(0.0, 0.99, 40) # Large enough to take the compiled path when available
+        i_idx, j_idx = close_pairs(scales, 0.05)
+        expected = [(i, j) for i in range(40) for j in range(i + 1, 40)
+                    if scale_distance(scales[i], scales[j]) < 0.05]
+        self.assertEqual(list(zip(i_idx.tolist(), j_idx.tolist())), expected)
+
     def test_scale_biased_encounter_rule(self):
         entities = [Entity(scale=0.1), Entity(scale=0.15), Entity(scale=0.9)]
         interactions = scale_biased_encounter_rule(entities)
@@ -214,6 +466,96 @@ class TestUniverse(unittest.TestCase):
         self.assertIn(e1, interactions[0].participants)
         self.assertIn(e2, interactions[0].participants)
 
+    def test_add_entity_tracks_scales(self):
+        universe = Universe()
+        for i in range(20):
+            universe.add_entity(Entity(scale=i / 20))
+        self.assertEqual(len(universe.scales), 20)
+        self.assertEqual(list(universe.scales), [e.scale for e in universe.entities])
+
+    def test_fusion_rule_with_universe(self):
+        universe = Universe()
+        e1 = Entity(scale=0.98)
+        e2 = Entity(scale=0.5)
+        e3 = Entity(scale=0.01) # Close to e1 across the 0/1 boundary
+        for e in (e1, e2, e3):
+            universe.add_entity(e)
+
+        interactions = fusion_rule(universe.entities, universe=universe)
+        self.assertEqual(len(interactions), 1)
+        self.assertIn(e1, interactions[0].participants)
+        self.assertIn(e3, interactions[0].participants)
+
+    def test_swept_close_pairs(self):
+        universe = Universe()
+        for i in range(300):
+            universe.add_entity(Entity(scale=(i * 0.618) % 1.0))
+        expected = close_pairs(universe.scales, 0.05)
+        actual = universe._swept_close_pairs(0.05)
+        self.assertEqual(actual[0].tolist(), expected[0].tolist())
+        self.assertEqual(actual[1].tolist(), expected[1].tolist())
+
+    def test_sorted_scales_follow_added_entities(self):
+        universe = Universe()
+        for scale in (0.5, 0.1, 0.9, 0.5):
+            universe.add_entity(Entity(scale=scale))
+        universe._sorted_scales()
+        for scale in (0.3, 0.5, 0.0, 1.0):
+            universe.add_entity(Entity(scale=scale))
+        order, sorted_scales = universe._sorted_scales()
+        np.testing.assert_array_equal(order, np.argsort(universe.scales, kind="stable"))
+        np.testing.assert_array_equal(sorted_scales, np.sort(universe.scales))
+
+    def test_close_pairs_cached_until_entity_added(self):
+        universe = Universe()
+        for scale in (0.1, 0.12, 0.5):
+            universe.add_entity(Entity(scale=scale))
+        pairs = universe.close_pairs(0.05)
+        self.assertIs(universe.close_pairs(0.05), pairs)
+        with self.assertRaises(ValueError):
+            pairs[0][0] = 2
+        universe.add_entity(Entity(scale=0.52))
+        i_idx, j_idx = universe.close_pairs(0.05)
+        self.assertEqual(list(zip(i_idx, j_idx)), [(0, 1), (2, 3)])
+
+    def test_set_scale_refreshes_scale_searches(self):
+        universe = Universe()
+        a = Entity(scale=0.1)
+        b = Entity(scale=0.5)
+        universe.add_entity(a)
+        universe.add_entity(b)
+        self.assertIsNone(fusion_rule(universe.entities, universe=universe))
+        universe._sorted_scales()
+        universe.set_scale(b, 0.11)
+        self.assertEqual(b.scale, 0.11)
+        interactions = fusion_rule(universe.entities, universe=universe)
+        self.assertEqual(set(interactions[0].participants), {a, b})
+        self.assertEqual(list(universe._sorted_scales()[0]), [0, 1])
+        with self.assertRaises(ValueError):
+            universe.set_scale(Entity(), 0.3)
+
+    def test_tick_shares_close_pairs_between_scale_rules(self):
+        universe = Universe()
+        e1 = Entity(scale=0.10)
+        e2 = Entity(scale=0.12)
+        e3 = Entity(scale=0.30)
+        for e in (e1, e2, e3):
+            universe.add_entity(e)
+
+        seen = {}
+        def make_rule(name, threshold):
+            @scale_rule(threshold)
+            def rule(entities, candidates=None):
+                seen[name] = [(entities[i], entities[j]) for i, j in zip(*candidates)]
+                return []
+            return rule
+        universe.add_interaction_rule(make_rule("narrow", 0.05))
+        universe.add_interaction_rule(make_rule("wide", 0.25))
+        universe.tick()
+
+        self.assertEqual(seen["narrow"], [(e1, e2)])
+        self.assertEqual(seen["wide"], [(e1, e2), (e1, e3), (e2, e3)])
+
     def test_group_formation_rule(self):
         universe = Universe()
         e1 = Entity()
@@ -245,6 +587,21 @@ class TestUniverse(unittest.TestCase):
 
         self.assertIsNotNone(e1.properties.get("group_id"))
         self.assertEqual(e1.properties["group_id"], e2.properties["group_id"])
+        self.assertTrue(universe.has_interaction_type("group_formed"))
+        self.assertFalse(universe.has_interaction_type("fusion"))
+
+    def test_group_formation_rule_from_histories(self):
+        e1 = Entity()
+        e2 = Entity()
+        e3 = Entity()
+        bond = Interaction([e1, e2], interaction_type="bond")
+        bond.record_interaction(e1)
+        bond.record_interaction(e2)
+
+        interactions = group_formation_rule([e1, e2, e3])
+        self.assertEqual(len(interactions), 1)
+        self.assertEqual(interactions[0].interaction_type, "group_formed")
+        self.assertEqual(set(interactions[0].participants), {e1, e2})
 
     def test_persistent_interaction_rule(self):
         # Reset global state for this test
@@ -271,5 +628,17 @@ class TestUniverse(unittest.TestCase):
         self.assertIsNone(interactions) # Should stop after max_interactions
         self.assertEqual(universe_model.persistent_interaction_count, 2)
 
+    def test_persistent_interaction_rules_are_independent(self):
+        first = make_persistent_interaction_rule(max_interactions=1)
+        second = make_persistent_interaction_rule(max_interactions=1)
+        entities = [Entity(), Entity()]
+
+        interactions = first(entities)
+        self.assertEqual(interactions[0].interaction_type, "persistent_bond")
+        self.assertEqual(set(interactions[0].participants), set(entities))
+        self.assertIsNone(first(entities))
+        self.assertEqual(len(second(entities)), 1) # Unaffected by the first rule's count
+        self.assertIsNone(universe_model.persistent_pair) # Module globals are untouched
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
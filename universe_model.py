@@ -14,13 +14,96 @@ from this structured approach to understanding complex systems, observing emerge
 and interpreting abstract concepts through simulation.
 '''
 
+import heapq
+import itertools
+import sys
 import time
-import uuid
+import types
 import random
 import matplotlib.pyplot as plt
 import networkx as nx
+import numpy as np
 import math
-from collections import Counter
+from collections import Counter, deque
+
+try:
+    from numba import njit, prange
+except ImportError: # Numba is optional; scale-based rules fall back to numpy without it.
+    njit = None
+
+try:
+    import igraph
+except ImportError: # python-igraph is optional; it is only needed for Observer.to_igraph.
+    igraph = None
+
+# Interaction types are interned so dispatch-table lookups and comparisons against them
+# resolve on object identity instead of character-by-character string equality.
+GRAVITY = sys.intern("gravity")
+FUSION = sys.intern("fusion")
+GROUP_FORMED = sys.intern("group_formed")
+
+# Metadata shared by every interaction of a rule that always carries the same values.
+# Read-only proxies make the sharing safe and spare each interaction its own dict.
+_NO_METADATA = types.MappingProxyType({})
+_GRAVITY_METADATA = types.MappingProxyType({"mass_change": 1})
+_FUSION_METADATA = types.MappingProxyType({"energy_gain": 5})
+
+# Marks a perceived entity that carries no group_id (distinct from a group_id of None).
+_UNGROUPED = object()
+
+def _grown(buffer, n, capacity):
+    """Copies the first n items of a numpy buffer into a new buffer of the given capacity."""
+    grown = np.empty(capacity, dtype=buffer.dtype)
+    grown[:n] = buffer[:n]
+    return grown
+
+# Source of property versions. Versions are unique across all property dicts, so a cached view
+# keyed on a version can never mistake one dict for another.
+_property_versions = itertools.count()
+
+class _Properties(dict):
+    """
+    An entity's properties: a plain dict that takes a fresh `version` on every change, so views
+    cached from it (an entity's repr, an observer's snapshot) know when to refresh.
+    """
+    __slots__ = ("version",)
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self.version = next(_property_versions)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self.version = next(_property_versions)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self.version = next(_property_versions)
+
+    def __ior__(self, other):
+        dict.update(self, other)
+        self.version = next(_property_versions)
+        return self
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self.version = next(_property_versions)
+
+    def setdefault(self, key, default=None):
+        self.version = next(_property_versions)
+        return dict.setdefault(self, key, default)
+
+    def pop(self, *args):
+        self.version = next(_property_versions)
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self.version = next(_property_versions)
+        return dict.popitem(self)
+
+    def clear(self):
+        dict.clear(self)
+        self.version = next(_property_versions)
 
 class Entity:
     '''
@@ -32,10 +115,25 @@ class Entity:
     **Axiom I: The Loop of Scale**
     Entities possess a 'scale' attribute, reflecting their position on the continuous, cyclical spectrum
     of dimensions. This influences interaction probabilities.
+
+    Once an entity has been added to a universe, change its scale through `Universe.set_scale`:
+    the universe keeps its own copy of every scale, and assigning `scale` directly leaves that
+    copy (and the scale searches built from it) out of date.
     '''
-    def __init__(self, scale=None):
-        self.id = uuid.uuid4() # Unique identifier for the entity
-        self.interaction_history = [] # Records all interactions this entity has participated in
+    # Slots drop the per-instance __dict__; simulations create entities in bulk.
+    __slots__ = ("id", "interaction_history", "local_time", "scale", "properties",
+                 "_cached_repr", "_cached_repr_version", "_cached_repr_scale")
+    _REPR_NAME = "Entity"
+    _next_id = itertools.count() # Shared by all entity kinds, so ids are unique across them
+
+    def __init__(self, scale=None, *, history_size=None):
+        # Unique identifier for the entity. A small int hashes and compares in one step, and the
+        # id is used as a key throughout (observer graphs, pair counts, group formation).
+        self.id = next(Entity._next_id)
+        # Records the interactions this entity has participated in. With a history_size the
+        # record is a ring buffer keeping only the most recent interactions, which bounds the
+        # memory of long simulations; by default the full history is kept.
+        self.interaction_history = [] if history_size is None else deque(maxlen=history_size)
         self.local_time = 0 # Local measure of time, incremented with each interaction (Axiom IV)
         
         # Scale is randomly initialized if not provided, representing Axiom I's continuous spectrum.
@@ -44,13 +142,47 @@ class Entity:
         
         # Properties are dynamically assigned and modified through interactions (Axiom IV).
         # This dictionary holds emergent attributes like 'mass', 'energy', 'group_id', etc.
-        self.properties = {}
+        # It records a new version on every change (see `_prop_version`).
+        self.properties = _Properties()
+        self._cached_repr = None
+        self._cached_repr_version = None
+        self._cached_repr_scale = None
+
+    @property
+    def _prop_version(self):
+        """
+        The version of the current properties, or None when they cannot be tracked (a plain
+        dict assigned to `properties`), in which case cached views are always rebuilt.
+        """
+        return getattr(self.properties, "version", None)
 
     def __repr__(self):
         # Provides a string representation of the entity, including its ID, scale, and properties.
-        prop_str = ", ".join(f"{k}={v}" for k, v in self.properties.items())
-        group_str = f"Group:{self.properties.get('group_id', 'None')}" if 'group_id' in self.properties else ''
-        return f"Entity({str(self.id)[:8]}\nScale:{self.scale:.2f}\n{prop_str}\n{group_str})"
+        # The string is rebuilt only when the properties or the scale have changed since it was
+        # last formatted.
+        version = self._prop_version
+        if version is None or version != self._cached_repr_version or self.scale != self._cached_repr_scale:
+            prop_str = ", ".join(f"{k}={v}" for k, v in self.properties.items())
+            group_str = f"Group:{self.properties.get('group_id', 'None')}" if 'group_id' in self.properties else ''
+            self._cached_repr = f"{self._REPR_NAME}({self.id:08d}\nScale:{self.scale:.2f}\n{prop_str}\n{group_str})"
+            self._cached_repr_version = version
+            self._cached_repr_scale = self.scale
+        return self._cached_repr
+
+def _apply_gravity(interaction, entity):
+    """Gravity accumulates 'mass' on each participant (Axiom IV)."""
+    entity.properties["mass"] = entity.properties.get("mass", 0) + interaction.metadata.get("mass_change", 1)
+
+def _apply_fusion(interaction, entity):
+    """Fusion releases 'energy' into each participant (Axiom IV)."""
+    entity.properties["energy"] = entity.properties.get("energy", 0) + interaction.metadata.get("energy_gain", 10)
+
+def _apply_group(interaction, entity):
+    """Assigns group_id to entities involved in group formation (Axiom V)."""
+    entity.properties["group_id"] = interaction.metadata.get("group_id")
+
+# The numeric property each effect changes, so a universe can mirror it in a column.
+_EFFECT_PROPERTIES = {GRAVITY: "mass", FUSION: "energy"}
 
 class Interaction:
     '''
@@ -60,15 +192,24 @@ class Interaction:
     Interactions are the fundamental units of reality. They define an entity's properties
     and contribute to its local measure of time.
     '''
+    # Maps each interaction type to the property mutation it causes. Types without an entry
+    # (e.g. "scale_biased_encounter") only advance local time.
+    _EFFECTS = {
+        GRAVITY: _apply_gravity,
+        FUSION: _apply_fusion,
+        GROUP_FORMED: _apply_group,
+    }
+    __slots__ = ("id", "timestamp", "participants", "interaction_type", "metadata")
+    _next_id = itertools.count()
+
     def __init__(self, participants, interaction_type="generic", metadata=None):
         if len(participants) < 2:
             raise ValueError("Interaction requires at least two participants.")
-        self.id = uuid.uuid4() # Unique identifier for the interaction
+        self.id = next(Interaction._next_id) # Unique identifier for the interaction
         self.timestamp = time.time() # When the interaction occurred
         self.participants = participants # List of entities involved in the interaction
-        self.interaction_type = interaction_type # Categorizes the interaction (e.g., "gravity", "fusion")
-        self.metadata = metadata if metadata else {}
-        
+        self.interaction_type = sys.intern(interaction_type) # Categorizes the interaction (e.g., "gravity", "fusion")
+        self.metadata = metadata if metadata else _NO_METADATA
 
     def record_interaction(self, entity):
         """Records this interaction in the history of a single participant and advances its local time."""
@@ -81,64 +222,212 @@ class Interaction:
         Applies the effects of this interaction to an entity.
         This is where properties are dynamically assigned/modified based on interaction type.
         """
-        if self.interaction_type == "gravity":
-            current_mass = entity.properties.get("mass", 0)
-            entity.properties["mass"] = current_mass + self.metadata.get("mass_change", 1)
-        elif self.interaction_type == "fusion":
-            current_energy = entity.properties.get("energy", 0)
-            entity.properties["energy"] = current_energy + self.metadata.get("energy_gain", 10)
-        elif self.interaction_type == "group_formed":
-            # Assign group_id to entities involved in group formation (Axiom V)
-            entity.properties["group_id"] = self.metadata.get("group_id")
-            # DEBUG: print(f"DEBUG: Entity {entity.id} assigned group_id: {entity.properties['group_id']}")
+        effect = Interaction._EFFECTS.get(self.interaction_type)
+        if effect is not None:
+            effect(self, entity)
 
     def __repr__(self):
-        return f"Interaction({self.interaction_type}, {str(self.id)[:8]})"
+        return f"Interaction({self.interaction_type}, {self.id:08d})"
 
 class Observer(Entity):
     '''
     A specialized entity that builds an internal model of reality (Axiom III)
     and serves as a point of pattern-sensing (Axiom VI).
+
+    The pattern summaries reported by `find_patterns` are maintained incrementally as
+    signals are perceived. The full `reality_model` graph is kept alongside them unless
+    the observer is created with `keep_graph=False`; the perceived edges are always kept
+    as compact integer arrays (see `perceived_edges`), which is all a large run may need.
     '''
-    def __init__(self, scale=None):
-        Entity.__init__(self, scale)
-        # reality_model is now a NetworkX MultiDiGraph to represent perceived relationships
-        self.reality_model = nx.MultiDiGraph() 
+    _REPR_NAME = "OBSERVER"
+    __slots__ = ("reality_model", "boundary_model", "_node_groups", "_uf_parent", "_num_clusters", "_degree",
+                 "_type_map", "_type_names", "_type_counts", "_edge_src", "_edge_dst", "_type_codes", "_num_typed", "_group_counter", "_num_edges",
+                 "_snapshot_versions")
+
+    def __init__(self, scale=None, *, keep_graph=True, history_size=None):
+        Entity.__init__(self, scale, history_size=history_size)
+        # reality_model is a NetworkX MultiGraph: one undirected edge per perceived interaction
+        self.reality_model = nx.MultiGraph() if keep_graph else None
         self.boundary_model = lambda entity: entity is self
 
+        # Running summaries of the perceived reality, updated in O(1) per perceived signal.
+        self._node_groups = {} # Perceived entity id -> its last perceived group_id
+        # Union-find forest over perceived entity ids; its trees are the perceived clusters.
+        self._uf_parent = {}
+        self._num_clusters = 0
+        self._degree = Counter() # Perceived entity id -> number of perceived edge endpoints
+        # Perceived binary interactions as an edge list in perception order: the participant
+        # ids and the integer-coded interaction type of each, in parallel buffers.
+        self._type_map = {} # Interaction type -> code
+        self._type_names = [] # Code -> interaction type
+        self._type_counts = [] # Code -> number of perceived interactions of that type
+        self._edge_src = np.empty(0, dtype=np.int64)
+        self._edge_dst = np.empty(0, dtype=np.int64)
+        self._type_codes = np.empty(0, dtype=np.int32)
+        self._num_typed = 0
+        self._group_counter = Counter() # group_id -> number of perceived entities in that group
+        self._num_edges = 0
+        # Perceived entity id -> the entity's _prop_version when its graph snapshot was taken
+        self._snapshot_versions = {}
+
     def perceive_signal(self, interaction):
         """
         Processes an interaction and updates the internal reality model (Axiom III).
         Builds a graph of perceived entities and their interactions.
         """
-        if self not in interaction.participants:
-            return
+        self.perceive_signals([interaction])
 
-        # Add participants as nodes to the reality model
-        for entity in interaction.participants:
-            if entity.id not in self.reality_model:
-                self.reality_model.add_node(entity.id, 
-                                            properties=entity.properties.copy(),
+    def perceive_signals(self, interactions):
+        """
+        Processes a batch of interactions in order, as `perceive_signal` would one at a time.
+        The graph edges for the whole batch are inserted with a single `add_edges_from` call.
+        """
+        self._perceive_own([interaction for interaction in interactions if self in interaction.participants])
+
+    def _perceive_own(self, interactions):
+        """
+        `perceive_signals` for interactions already known to include this observer.
+        `Universe.tick` only hands an observer the interactions it took part in, so it skips the check.
+        """
+        edges = []
+        for interaction in interactions:
+            # Add participants as nodes to the reality model
+            for entity in interaction.participants:
+                self._perceive_entity(entity)
+
+            # Add edges representing the interaction
+            # For simplicity, assuming binary interactions for edges
+            if len(interaction.participants) == 2:
+                e1, e2 = interaction.participants[0], interaction.participants[1]
+                edge_data = {"type": interaction.interaction_type,
+                             "timestamp": interaction.timestamp,
+                             "metadata": interaction.metadata}
+                # Perception is undirected, so one edge serves both directions
+                edges.append((e1.id, e2.id, interaction.id, edge_data))
+                # Relationships are reported per direction: each interaction counts once each way.
+                self._union(e1.id, e2.id)
+                self._degree[e1.id] += 2
+                self._degree[e2.id] += 2
+                self._record_edge(e1.id, e2.id, interaction.interaction_type)
+                self._num_edges += 2
+
+        if edges and self.reality_model is not None:
+            self.reality_model.add_edges_from(edges)
+
+    def _record_edge(self, src, dst, interaction_type):
+        """Appends a perceived binary interaction to the edge buffers."""
+        code = self._type_map.get(interaction_type)
+        if code is None:
+            code = self._type_map[interaction_type] = len(self._type_names)
+            self._type_names.append(interaction_type)
+            self._type_counts.append(0)
+        self._type_counts[code] += 1
+        n = self._num_typed
+        if n == len(self._type_codes):
+            capacity = max(64, 2 * n)
+            self._edge_src = _grown(self._edge_src, n, capacity)
+            self._edge_dst = _grown(self._edge_dst, n, capacity)
+            self._type_codes = _grown(self._type_codes, n, capacity)
+        self._edge_src[n] = src
+        self._edge_dst[n] = dst
+        self._type_codes[n] = code
+        self._num_typed = n + 1
+
+    def perceived_edges(self):
+        """
+        The perceived binary interactions as (src, dst, type_codes) numpy arrays, one entry per
+        interaction in perception order. Type codes index `perceived_types()`.
+        """
+        n = self._num_typed
+        return self._edge_src[:n], self._edge_dst[:n], self._type_codes[:n]
+
+    def perceived_types(self):
+        """The perceived interaction types, indexed by the codes in `perceived_edges`."""
+        return list(self._type_names)
+
+    def perceived_adjacency(self):
+        """
+        The undirected perceived graph in compressed sparse row form: (node_ids, indptr, neighbors).
+        The neighbours of node_ids[k] are node_ids[neighbors[indptr[k]:indptr[k + 1]]], with one
+        entry per perceived interaction. Only entities with at least one edge are included.
+        """
+        src, dst, _ = self.perceived_edges()
+        node_ids, endpoints = np.unique(np.concatenate((src, dst)), return_inverse=True)
+        n = len(src)
+        rows = np.concatenate((endpoints[:n], endpoints[n:]))
+        cols = np.concatenate((endpoints[n:], endpoints[:n]))
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(len(node_ids) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(rows, minlength=len(node_ids)), out=indptr[1:])
+        return node_ids, indptr, cols[order]
+
+    def _most_frequent_types(self, k):
+        """
+        The k most perceived interaction types with their edge counts, most frequent first.
+        Ties keep first-perceived order, as `Counter.most_common` would.
+        """
+        # Every binary interaction counts once in each direction.
+        counts = 2 * np.array(self._type_counts, dtype=np.int64)
+        top = np.argsort(-counts, kind="stable")[:k]
+        return [(self._type_names[code], int(counts[code])) for code in top]
+
+    def to_igraph(self):
+        """
+        Builds the perceived graph as an undirected python-igraph Graph from the perceived edge
+        arrays, for analyses beyond `find_patterns` on large runs. Vertices carry the perceived
+        entity ids as "entity_id"; edges carry the interaction type as "type".
+        Works with or without `keep_graph`. Raises ImportError if python-igraph is not installed.
+        """
+        if igraph is None:
+            raise ImportError("Observer.to_igraph requires python-igraph (pip install igraph).")
+        node_ids = list(self._node_groups)
+        vertex = {node_id: k for k, node_id in enumerate(node_ids)}
+        src, dst, codes = self.perceived_edges()
+        graph = igraph.Graph(n=len(node_ids),
+                             edges=[(vertex[a], vertex[b]) for a, b in zip(src.tolist(), dst.tolist())],
+                             directed=False)
+        graph.vs["entity_id"] = node_ids
+        graph.es["type"] = [self._type_names[code] for code in codes.tolist()]
+        return graph
+
+    def _perceive_entity(self, entity):
+        """Adds or refreshes a perceived entity, keeping the group tally in step with its properties."""
+        entity_id = entity.id
+        properties = entity.properties
+        if self.reality_model is not None:
+            node = self.reality_model.nodes.get(entity_id)
+            if node is None:
+                self.reality_model.add_node(entity_id,
+                                            properties=properties.copy(),
                                             scale=entity.scale,
                                             local_time=entity.local_time)
             else:
-                # Update properties if entity already exists in model
-                self.reality_model.nodes[entity.id]["properties"] = entity.properties.copy()
-                self.reality_model.nodes[entity.id]["local_time"] = entity.local_time
-
-        # Add edges representing the interaction
-        # For simplicity, assuming binary interactions for edges
-        if len(interaction.participants) == 2:
-            e1, e2 = interaction.participants[0], interaction.participants[1]
-            self.reality_model.add_edge(e1.id, e2.id, key=interaction.id,
-                                         type=interaction.interaction_type,
-                                         timestamp=interaction.timestamp,
-                                         metadata=interaction.metadata)
-            # Also add reverse edge for undirected perception, or if interaction is bidirectional
-            self.reality_model.add_edge(e2.id, e1.id, key=interaction.id,
-                                         type=interaction.interaction_type,
-                                         timestamp=interaction.timestamp,
-                                         metadata=interaction.metadata)
+                # Update properties if entity already exists in model. The snapshot is only
+                # copied again once the entity's properties have changed since the last one;
+                # untracked properties (version None) are always copied.
+                version = entity._prop_version
+                if version is None or self._snapshot_versions.get(entity_id) != version:
+                    node["properties"] = properties.copy()
+                node["local_time"] = entity.local_time
+            self._snapshot_versions[entity_id] = entity._prop_version
+
+        if entity_id not in self._uf_parent:
+            # A newly perceived entity starts out as a cluster of its own.
+            self._uf_parent[entity_id] = entity_id
+            self._num_clusters += 1
+        group_id = properties.get("group_id", _UNGROUPED)
+        previous = self._node_groups.get(entity_id, _UNGROUPED)
+        if group_id != previous:
+            if previous is not _UNGROUPED:
+                remaining = self._group_counter[previous] - 1
+                if remaining:
+                    self._group_counter[previous] = remaining
+                else:
+                    # Drop emptied groups, so find_patterns only walks groups that still have members.
+                    del self._group_counter[previous]
+            if group_id is not _UNGROUPED:
+                self._group_counter[group_id] += 1
+        self._node_groups[entity_id] = group_id
 
     def find_patterns(self):
         """
@@ -146,44 +435,48 @@ class Observer(Entity):
         Returns a dictionary of identified patterns.
         """
         patterns = {}
-
-        
+        num_nodes = len(self._node_groups)
 
         # Pattern 1: Number of perceived entities
-        patterns["num_perceived_entities"] = self.reality_model.number_of_nodes()
+        patterns["num_perceived_entities"] = num_nodes
 
         # Pattern 2: Number of perceived relationships
-        patterns["num_perceived_relationships"] = self.reality_model.number_of_edges()
+        patterns["num_perceived_relationships"] = self._num_edges
 
         # Pattern 3: Most frequent interaction types (counting unique interaction IDs)
-        interaction_ids_and_types = [(data["type"], u, v, key) for u, v, key, data in self.reality_model.edges(keys=True, data=True)]
-        unique_interaction_types = Counter([item[0] for item in interaction_ids_and_types]).most_common(3)
-        patterns["most_frequent_interactions"] = unique_interaction_types
-
-        # Pattern 4: Highly connected entities (hubs)
-        if self.reality_model.number_of_nodes() > 1:
-            degree_centrality = nx.degree_centrality(self.reality_model)
-            patterns["highly_connected_entities"] = sorted(degree_centrality.items(), key=lambda item: item[1], reverse=True)[:3]
+        patterns["most_frequent_interactions"] = self._most_frequent_types(3)
+
+        # Pattern 4: Highly connected entities (hubs), by degree centrality
+        if num_nodes > 1:
+            # Rank by raw degree and normalize only the three hubs that are reported.
+            scale = 1.0 / (num_nodes - 1)
+            hubs = heapq.nlargest(3, self._node_groups, key=self._degree.__getitem__)
+            patterns["highly_connected_entities"] = [(node_id, self._degree[node_id] * scale) for node_id in hubs]
         else:
             patterns["highly_connected_entities"] = []
 
         # Pattern 5: Perceived clusters (connected components)
-        patterns["num_perceived_clusters"] = nx.number_weakly_connected_components(self.reality_model)
+        patterns["num_perceived_clusters"] = self._num_clusters
 
         # Pattern 6: Perceived groups (Axiom V)
-        perceived_groups = Counter()
-        for node_id in self.reality_model.nodes():
-            node_properties = self.reality_model.nodes[node_id].get("properties", {})
-            if "group_id" in node_properties:
-                perceived_groups[node_properties["group_id"]] += 1
-        patterns["perceived_groups"] = {group_id: count for group_id, count in perceived_groups.items() if count > 1} # Only report groups with more than one member
+        patterns["perceived_groups"] = {group_id: count for group_id, count in self._group_counter.items() if count > 1} # Only report groups with more than one member
 
         return patterns
 
-    def __repr__(self):
-        prop_str = ", ".join(f"{k}={v}" for k, v in self.properties.items())
-        group_str = f"Group:{self.properties.get('group_id', 'None')}" if 'group_id' in self.properties else ''
-        return f"OBSERVER({str(self.id)[:8]}\nScale:{self.scale:.2f}\n{prop_str}\n{group_str})"
+    def _find(self, node_id):
+        """Returns the root of node_id's cluster, halving the path on the way up."""
+        parent = self._uf_parent
+        while parent[node_id] != node_id:
+            parent[node_id] = parent[parent[node_id]]
+            node_id = parent[node_id]
+        return node_id
+
+    def _union(self, a, b):
+        """Merges the clusters of a and b, if they are not already one."""
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self._uf_parent[root_b] = root_a
+            self._num_clusters -= 1
 
 class Universe:
     '''
@@ -197,18 +490,205 @@ class Universe:
     The universe exists because there are more ways to exist (non-uniformity) than not to exist (perfect uniformity).
     The simulation implicitly demonstrates this by generating varied entities and interactions.
     '''
-    def __init__(self):
+    # Numeric entity properties mirrored as per-entity numpy columns (see `property_column`).
+    PROPERTY_COLUMNS = ("mass", "energy")
+
+    def __init__(self, history_size=None):
         self.entities = [] # All entities currently in the universe
         self.interaction_rules = [] # Rules that govern how interactions can occur between entities
-        self.interaction_history = [] # Global record of all interactions that have occurred
+        self._rule_min_entities = {} # id(rule) -> fewest entities the rule can act on
+        # frozenset of two entity ids -> how often the pair has interacted, kept current by tick
+        # so group formation never rescans entity histories.
+        self._pair_counts = Counter()
+        self._entity_by_id = {} # Entity id -> entity, for O(1) lookups from pair tallies
+        # Entity id -> the entity's row in this universe's per-entity arrays. Rows live here rather
+        # than on the entity, since one entity may be added to several universes.
+        self._rows = {}
+        # Global record of the interactions that have occurred. With a history_size it is a ring
+        # buffer of the most recent interactions; by default it is a list of all of them. Their
+        # types are kept in a parallel record so type queries scan interned strings instead of
+        # Interaction objects.
+        self.interaction_history = [] if history_size is None else deque(maxlen=history_size)
+        self._history_types = [] if history_size is None else deque(maxlen=history_size)
+        # Structure-of-arrays mirror of entity scales, aligned with self.entities (Axiom I).
+        # Scale-based rules read this buffer instead of touching every Entity object.
+        self._scales = np.empty(0, dtype=np.float64)
+        # Entity indices ordered by scale and the matching sorted scales, shared by every
+        # sweep over the scale spectrum. Built on first use; entities added afterwards wait in
+        # _pending_sorted and are merged in one pass by the next `_sorted_scales` call.
+        self._scale_order = None
+        self._sorted_scale_values = None
+        self._pending_sorted = []
+        self._columns = {name: np.empty(0, dtype=np.float64) for name in self.PROPERTY_COLUMNS}
+        # Close pairs depend only on the scales, which change only through add_entity and
+        # set_scale, so searches are cached until one of those is called: threshold -> (i, j),
+        # and the last fused pass as (rule key, candidates).
+        self._close_pair_cache = {}
+        self._fused_cache = None
+        # Node positions from the last `visualize_universe` call, relaxed again only once the
+        # set of entities has changed.
+        self._layout = None
+        self._layout_dirty = True
+        # The graph drawn by `visualize_universe`, extended with only the interactions recorded
+        # since the previous call: _num_recorded counts every interaction ever recorded and
+        # _visualized_through how many of those the graph already holds.
+        self._view_graph = nx.Graph()
+        self._num_recorded = 0
+        self._visualized_through = 0
 
     def add_entity(self, entity):
         """Adds a new entity to the universe."""
+        n = len(self.entities)
+        if n == len(self._scales):
+            # Grow the buffers geometrically so appends stay amortized O(1).
+            capacity = max(8, 2 * n)
+            self._scales = _grown(self._scales, n, capacity)
+            for name, column in self._columns.items():
+                self._columns[name] = _grown(column, n, capacity)
+        self._scales[n] = entity.scale
+        for name, column in self._columns.items():
+            column[n] = entity.properties.get(name, 0)
+        self._rows[entity.id] = n
         self.entities.append(entity)
+        if self._scale_order is not None:
+            self._pending_sorted.append(n)
+        self._entity_by_id[entity.id] = entity
+        self._close_pair_cache.clear()
+        self._fused_cache = None
+        self._layout_dirty = True
 
-    def add_interaction_rule(self, rule):
-        """Adds a new rule that can generate interactions within the universe."""
+    def set_scale(self, entity, scale):
+        """
+        Moves an entity of this universe to a new scale (Axiom I), keeping the universe's scale
+        buffer and the scale searches built from it in step.
+        """
+        row = self._rows.get(entity.id)
+        if row is None:
+            raise ValueError("Entity is not part of this universe.")
+        entity.scale = scale
+        self._scales[row] = scale
+        self._scale_order = None
+        self._sorted_scale_values = None
+        self._pending_sorted = []
+        self._close_pair_cache.clear()
+        self._fused_cache = None
+
+    def property_column(self, name):
+        """
+        The values of a numeric property (one of PROPERTY_COLUMNS) for all entities, as a numpy
+        array in the same order as `self.entities`; entities without the property read 0.
+        The column follows the effects applied by `tick`.
+        """
+        return self._columns[name][:len(self.entities)]
+
+    def has_interaction_type(self, interaction_type):
+        """True if an interaction of the given type is still in the recorded history."""
+        return interaction_type in self._history_types
+
+    @property
+    def scales(self):
+        """The scales of all entities as a numpy array, in the same order as `self.entities`."""
+        return self._scales[:len(self.entities)]
+
+    def close_pairs(self, threshold):
+        """
+        `close_pairs` over this universe's entities.
+        Without Numba, large populations are found by a sweep over the scale-sorted entities
+        (see `_swept_close_pairs`), which never materializes the N x N distance matrix.
+        The result is cached until an entity is added, so its arrays are read-only.
+        """
+        pairs = self._close_pair_cache.get(threshold)
+        if pairs is None:
+            if _close_pairs_kernel is None and len(self.entities) >= _SWEEP_MIN_ENTITIES:
+                pairs = self._swept_close_pairs(threshold)
+            else:
+                pairs = close_pairs(self.scales, threshold)
+            pairs = _read_only(pairs)
+            self._close_pair_cache[threshold] = pairs
+        return pairs
+
+    def _sorted_scales(self):
+        """Returns (order, sorted_scales): entity indices in scale order and their scales."""
+        if self._scale_order is None:
+            self._scale_order = np.argsort(self.scales, kind="stable")
+            self._sorted_scale_values = self.scales[self._scale_order]
+        elif self._pending_sorted:
+            # Merge the entities added since the last call: sort just those, then insert them
+            # all in one O(N + k) pass. New entities go after equal scales (they have higher
+            # indices), so the order still matches a stable argsort.
+            added = np.array(self._pending_sorted, dtype=np.intp)
+            added = added[np.argsort(self._scales[added], kind="stable")]
+            added_scales = self._scales[added]
+            ranks = np.searchsorted(self._sorted_scale_values, added_scales, side="right")
+            self._scale_order = np.insert(self._scale_order, ranks, added)
+            self._sorted_scale_values = np.insert(self._sorted_scale_values, ranks, added_scales)
+            self._pending_sorted = []
+        return self._scale_order, self._sorted_scale_values
+
+    def _swept_close_pairs(self, threshold):
+        """
+        Finds close pairs in O(N log N + K) for K matches. On the scale-sorted entities, each
+        entity's partners form one window just above it (direct distance) and one at the top
+        of the spectrum (distance across the 0/1 boundary); both are located by binary search.
+        """
+        n = len(self.entities)
+        if threshold > 0.5: # No cyclical distance exceeds 0.5, so every pair qualifies
+            return np.triu_indices(n, 1)
+
+        order, ss = self._sorted_scales()
+        ranks = np.arange(n)
+        # Windows are widened slightly and then filtered exactly, so edge cases round the same
+        # way as in close_pairs.
+        slack = 1e-12
+        direct_end = np.maximum(np.searchsorted(ss, ss + threshold + slack, side="right"), ranks + 1)
+        wrap_start = np.maximum(np.searchsorted(ss, ss + (1.0 - threshold) - slack, side="left"), direct_end)
+        rows, cols = [], []
+        for start, stop in ((ranks + 1, direct_end), (wrap_start, np.full(n, n))):
+            counts = stop - start
+            row = np.repeat(ranks, counts)
+            # For each row, the consecutive ranks start[row] .. stop[row] - 1.
+            col = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(start, counts)
+            rows.append(row)
+            cols.append(col)
+        row, col = np.concatenate(rows), np.concatenate(cols)
+
+        dist = ss[col] - ss[row]
+        keep = np.minimum(dist, 1.0 - dist) < threshold
+        a, b = order[row[keep]], order[col[keep]]
+        i_idx, j_idx = np.minimum(a, b), np.maximum(a, b)
+        ordering = np.lexsort((j_idx, i_idx)) # Same row-by-row order as close_pairs
+        return i_idx[ordering], j_idx[ordering]
+
+    def _fused_scale_pass(self):
+        """
+        Searches for close pairs once on behalf of every threshold rule (see `scale_rule`).
+        A single search at the widest threshold is split per rule by that rule's threshold.
+        Returns a mapping of id(rule) -> (i, j) candidate index arrays.
+        """
+        scale_rules = [rule for rule in self.interaction_rules if getattr(rule, "scale_threshold", None) is not None]
+        if not scale_rules:
+            return {}
+        key = tuple((id(rule), rule.scale_threshold) for rule in scale_rules)
+        if self._fused_cache is not None and self._fused_cache[0] == key:
+            return self._fused_cache[1]
+        i_idx, j_idx = self.close_pairs(max(rule.scale_threshold for rule in scale_rules))
+        scales = self.scales
+        dist = np.abs(scales[i_idx] - scales[j_idx])
+        dist = np.minimum(dist, 1.0 - dist)
+        candidates = {}
+        for rule in scale_rules:
+            keep = dist < rule.scale_threshold
+            candidates[id(rule)] = _read_only((i_idx[keep], j_idx[keep]))
+        self._fused_cache = (key, candidates)
+        return candidates
+
+    def add_interaction_rule(self, rule, min_entities=2):
+        """
+        Adds a new rule that can generate interactions within the universe.
+        `tick` skips the rule while the universe holds fewer than `min_entities` entities.
+        """
         self.interaction_rules.append(rule)
+        self._rule_min_entities[id(rule)] = min_entities
 
     def tick(self):
         """
@@ -217,22 +697,58 @@ class Universe:
         During a tick:
         1. Interaction rules are applied to generate new interactions.
         2. New interactions are recorded globally.
-        3. Observers perceive relevant interactions and update their internal models.
+        3. Observers perceive the interactions they took part in and update their internal models.
         """
+        if not self.interaction_rules:
+            return []
+
         new_interactions = []
+        num_entities = len(self.entities)
+        candidates = self._fused_scale_pass()
         for rule in self.interaction_rules:
-            interactions = rule(self.entities)
+            if num_entities < self._rule_min_entities.get(id(rule), 2):
+                continue # An interaction needs at least two participants
+            kwargs = {}
+            if getattr(rule, "uses_universe", False):
+                kwargs["universe"] = self
+            if id(rule) in candidates:
+                kwargs["candidates"] = candidates[id(rule)]
+            interactions = rule(self.entities, **kwargs)
             if interactions:
                 new_interactions.extend(interactions)
         
         self.interaction_history.extend(new_interactions)
+        self._num_recorded += len(new_interactions)
+        self._history_types.extend(interaction.interaction_type for interaction in new_interactions)
 
+        perceived = {} # Observer -> the interactions it took part in this tick
+        touched = {} # Property column name -> entities whose value in it changed this tick
         for interaction in new_interactions:
-            for entity in interaction.participants:
+            participants = interaction.participants
+            if len(participants) == 2 and participants[0] is not participants[1]:
+                # Counted once per participant history the interaction lands in, the same
+                # tally a scan over entity histories would produce.
+                self._pair_counts[frozenset((participants[0].id, participants[1].id))] += 2
+            name = _EFFECT_PROPERTIES.get(interaction.interaction_type)
+            changed = touched.setdefault(name, []) if name in self._columns else None
+            for entity in participants:
                 interaction.record_interaction(entity) # Record interaction for each participant
                 interaction.apply_effects(entity) # Apply effects for each participant
+                if changed is not None and entity.id in self._rows:
+                    changed.append(entity)
                 if isinstance(entity, Observer):
-                    entity.perceive_signal(interaction)
+                    perceived.setdefault(entity, []).append(interaction)
+
+        # Mirror the tick's property changes into the columns with one scatter per column.
+        for name, changed in touched.items():
+            if changed:
+                indices = np.fromiter((self._rows[entity.id] for entity in changed), dtype=np.intp, count=len(changed))
+                values = np.fromiter((entity.properties[name] for entity in changed), dtype=np.float64, count=len(changed))
+                self._columns[name][indices] = values
+
+        # Each observer takes in its signals as one batch, once all effects of the tick have landed.
+        for observer, signals in perceived.items():
+            observer._perceive_own(signals)
         
         return new_interactions
 
@@ -242,25 +758,32 @@ def visualize_universe(universe, tick_number):
     Creates a graph visualization of the universe, showing entity properties and relationships.
     This helps in visually understanding the emergent patterns and interactions.
     """
-    G = nx.Graph()
-    node_colors = []
-    node_labels = {}
-
-    for entity in universe.entities:
+    # The graph persists on the universe; each call only adds what is new since the last one.
+    G = universe._view_graph
+    for entity in universe.entities[G.number_of_nodes():]:
         G.add_node(entity.id)
-        node_labels[entity.id] = repr(entity)
-        if isinstance(entity, Observer):
-            node_colors.append("lightblue")
-        else:
-            node_colors.append("yellow")
+    node_colors = ["lightblue" if isinstance(entity, Observer) else "yellow" for entity in universe.entities]
+    node_labels = {entity.id: repr(entity) for entity in universe.entities}
 
-    for interaction in universe.interaction_history:
+    history = universe.interaction_history
+    new = min(universe._num_recorded - universe._visualized_through, len(history))
+    # Walk back from the newest entry, so a deque history costs O(new) rather than O(len).
+    for interaction in reversed(list(itertools.islice(reversed(history), new))):
         p_ids = [p.id for p in interaction.participants]
         if p_ids[0] in G and p_ids[1] in G:
             G.add_edge(p_ids[0], p_ids[1])
+    universe._visualized_through = universe._num_recorded
 
     plt.figure(figsize=(12, 10))
-    pos = nx.spring_layout(G, k=0.5, iterations=50)
+    if not universe._layout: # No previous positions (or only those of an empty universe) to start from
+        pos = nx.spring_layout(G, k=0.5, iterations=50)
+    elif universe._layout_dirty:
+        # Start from the previous positions, so a few iterations settle the new entities.
+        pos = nx.spring_layout(G, pos=universe._layout, k=0.5, iterations=10)
+    else:
+        pos = universe._layout
+    universe._layout = pos
+    universe._layout_dirty = False
     nx.draw(G, pos, with_labels=False, node_color=node_colors, node_size=3000, font_size=10)
     nx.draw_networkx_labels(G, pos, labels=node_labels, font_size=8, verticalalignment="center")
     plt.title(f"Universe State at Tick {tick_number}")
@@ -277,27 +800,113 @@ def scale_distance(scale1, scale2):
     dist = abs(scale1 - scale2)
     return min(dist, 1 - dist)
 
-def scale_biased_encounter_rule(entities):
+def scale_distance_vec(scales):
+    """
+    Vectorized `scale_distance` over every pair of `scales`, returned as an N x N matrix.
+    Broadcasting keeps the O(N^2) work inside numpy ufuncs instead of N^2 Python calls.
+    """
+    dist = np.abs(scales[:, None] - scales[None, :])
+    return np.minimum(dist, 1.0 - dist)
+
+# Below this population the numpy path wins: JIT dispatch overhead dominates tiny scans.
+_KERNEL_MIN_ENTITIES = 32
+# Without the kernel, sweeping the scale-sorted entities beats the dense distance matrix from here on.
+_SWEEP_MIN_ENTITIES = 256
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _close_pairs_kernel(scales, threshold):
+        """
+        Compiled pair scan for `close_pairs`. Rows are counted in parallel first, so each
+        row can then write its pairs into a precomputed slice without synchronization.
+        """
+        n = scales.shape[0]
+        counts = np.zeros(n, dtype=np.int64)
+        for i in prange(n):
+            found = 0
+            for j in range(i + 1, n):
+                dist = abs(scales[i] - scales[j])
+                if min(dist, 1.0 - dist) < threshold:
+                    found += 1
+            counts[i] = found
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)
+        i_out = np.empty(offsets[n], dtype=np.int64)
+        j_out = np.empty(offsets[n], dtype=np.int64)
+        for i in prange(n):
+            k = offsets[i]
+            for j in range(i + 1, n):
+                dist = abs(scales[i] - scales[j])
+                if min(dist, 1.0 - dist) < threshold:
+                    i_out[k] = i
+                    j_out[k] = j
+                    k += 1
+        return i_out, j_out
+else:
+    _close_pairs_kernel = None
+
+def close_pairs(scales, threshold):
+    """
+    Finds every pair of scales closer than `threshold` on the cyclical spectrum (Axiom I).
+    Returns two index arrays (i, j) with i < j, ordered row by row.
+    Large populations use the Numba kernel when Numba is installed.
+    """
+    n = len(scales)
+    if _close_pairs_kernel is not None and n >= _KERNEL_MIN_ENTITIES:
+        return _close_pairs_kernel(scales, threshold)
+    i_idx, j_idx = np.triu_indices(n, 1)
+    close = scale_distance_vec(scales)[i_idx, j_idx] < threshold
+    return i_idx[close], j_idx[close]
+
+def _scales_of(entities):
+    """Collects the scales of a plain list of entities into a numpy array."""
+    return np.fromiter((e.scale for e in entities), dtype=np.float64, count=len(entities))
+
+def _read_only(arrays):
+    """Marks index arrays read-only so a cached result cannot be edited by a caller, and returns them."""
+    for array in arrays:
+        array.setflags(write=False)
+    return arrays
+
+def universe_rule(rule):
+    """
+    Marks an interaction rule as accepting a `universe` keyword argument.
+    `Universe.tick` passes itself to such rules so they can reuse its cached scale array.
+    """
+    rule.uses_universe = True
+    return rule
+
+def scale_rule(threshold):
+    """
+    Marks an interaction rule as acting on entity pairs closer than `threshold` in scale.
+    `Universe.tick` finds such pairs once for all marked rules and passes each rule its
+    share as `candidates=(i, j)`, two index arrays into `entities` with i < j.
+    """
+    def mark(rule):
+        rule.scale_threshold = threshold
+        return rule
+    return mark
+
+@universe_rule
+def scale_biased_encounter_rule(entities, universe=None):
     """
     Rule: Two entities interact, with a bias towards similar scales (Axiom I).
     This promotes self-organization by encouraging interactions within specific scale bands.
     """
     if len(entities) < 2: return None
 
-    e1 = random.choice(entities)
-    potential_e2s = [e for e in entities if e != e1]
-    if not potential_e2s: return None
+    scales = universe.scales if universe is not None else _scales_of(entities)
+    i1 = random.randrange(len(entities))
+    e1 = entities[i1]
 
-    weights = []
-    for e2 in potential_e2s:
-        dist = scale_distance(e1.scale, e2.scale)
-        weight = 1.0 / (dist + 0.01) 
-        weights.append(weight)
-    
-    total_weight = sum(weights)
-    probabilities = [w / total_weight for w in weights]
+    # Weights for every other entity, computed in one vectorized pass.
+    dist = np.abs(scales - e1.scale)
+    dist = np.minimum(dist, 1.0 - dist)
+    cum_weights = np.cumsum(np.delete(1.0 / (dist + 0.01), i1))
 
-    e2 = random.choices(potential_e2s, weights=probabilities, k=1)[0]
+    # Weighted draw by inverting the cumulative weights, as random.choices does.
+    j = int(np.searchsorted(cum_weights[:-1], random.random() * cum_weights[-1], side="right"))
+    e2 = entities[j + 1 if j >= i1 else j] # Step over e1, which was left out of the weights
     
     return [Interaction([e1, e2], interaction_type="scale_biased_encounter")]
 
@@ -308,46 +917,65 @@ def gravity_rule(entities):
     """
     if len(entities) < 2: return None
     participants = random.sample(entities, 2)
-    return [Interaction(participants, interaction_type="gravity", metadata={"mass_change": 1})]
+    return [Interaction(participants, interaction_type=GRAVITY, metadata=_GRAVITY_METADATA)]
 
-def fusion_rule(entities):
+FUSION_THRESHOLD = 0.05 # Scale distance below which entities can fuse
+
+@universe_rule
+@scale_rule(FUSION_THRESHOLD)
+def fusion_rule(entities, universe=None, candidates=None):
     """
     Rule: Entities with very close scales (e.g., within 0.05) have a 'fusion' interaction.
     This represents a self-organizing process at specific scales, potentially leading to
     the formation of more complex entities or structures (Axiom I, Axiom II).
     """
-    fusion_candidates = []
-    for i in range(len(entities)):
-        for j in range(i + 1, len(entities)):
-            e1, e2 = entities[i], entities[j]
-            if scale_distance(e1.scale, e2.scale) < 0.05: # Threshold for fusion
-                fusion_candidates.append((e1, e2))
+    if len(entities) < 2: return None
+
+    if candidates is not None:
+        i_idx, j_idx = candidates
+    elif universe is not None:
+        i_idx, j_idx = universe.close_pairs(FUSION_THRESHOLD)
+    else:
+        i_idx, j_idx = close_pairs(_scales_of(entities), FUSION_THRESHOLD)
     
-    if not fusion_candidates: return None
+    if len(i_idx) == 0: return None
 
-    e1, e2 = random.choice(fusion_candidates)
-    return [Interaction([e1, e2], interaction_type="fusion", metadata={"energy_gain": 5})]
+    k = random.randrange(len(i_idx))
+    e1, e2 = entities[i_idx[k]], entities[j_idx[k]]
+    return [Interaction([e1, e2], interaction_type=FUSION, metadata=_FUSION_METADATA)]
 
-def group_formation_rule(entities, interaction_threshold=2):
+# Source of group ids. Small ints hash and compare in one step wherever groups are tallied.
+_group_ids = itertools.count(1)
+
+@universe_rule
+def group_formation_rule(entities, interaction_threshold=2, universe=None):
     """
     Rule: Entities that have interacted frequently form a group (Axiom V).
     This rule simulates the emergence of perceived 'boundaries' or 'selves' through repeated interaction.
+    Within a universe the pair tallies it maintains are used; otherwise they are rebuilt
+    from the entities' interaction histories.
     """
     new_interactions = []
-    # Track interaction counts between pairs
-    interaction_counts = Counter()
-    for entity in entities:
-        for interaction in entity.interaction_history:
-            # Only consider binary interactions for group formation for simplicity
-            if len(interaction.participants) == 2:
-                p1, p2 = sorted(interaction.participants, key=lambda e: e.id)
-                interaction_counts[frozenset({p1.id, p2.id})] += 1
+    if universe is not None:
+        interaction_counts = universe._pair_counts
+        entity_by_id = universe._entity_by_id
+    else:
+        entity_by_id = {e.id: e for e in entities}
+        # Track interaction counts between pairs
+        interaction_counts = Counter()
+        for entity in entities:
+            for interaction in entity.interaction_history:
+                # Only consider binary interactions for group formation for simplicity
+                participants = interaction.participants
+                if len(participants) == 2:
+                    # A frozenset is already order-independent, so the pair needs no sorting.
+                    interaction_counts[frozenset((participants[0].id, participants[1].id))] += 1
     
     for pair_ids, count in interaction_counts.items():
         if count >= interaction_threshold:
-            e1_id, e2_id = list(pair_ids)
-            e1 = next((e for e in entities if e.id == e1_id), None)
-            e2 = next((e for e in entities if e.id == e2_id), None)
+            e1_id, e2_id = pair_ids
+            e1 = entity_by_id.get(e1_id)
+            e2 = entity_by_id.get(e2_id)
 
             if e1 and e2:
                 # Form a group if they are not already in the same group
@@ -356,13 +984,13 @@ def group_formation_rule(entities, interaction_threshold=2):
 
                 if group_id_e1 is None and group_id_e2 is None:
                     # Both entities are new to groups, form a new group
-                    new_group_id = str(uuid.uuid4())
-                    new_interactions.append(Interaction([e1, e2], interaction_type="group_formed", metadata={"group_id": new_group_id}))
+                    new_group_id = next(_group_ids)
+                    new_interactions.append(Interaction([e1, e2], interaction_type=GROUP_FORMED, metadata={"group_id": new_group_id}))
                 elif group_id_e1 != group_id_e2:
                     # Entities are in different groups, or one is in a group and the other isn't
                     # Assign the new group_id to the existing group_id if one exists, otherwise create a new one
-                    new_group_id = group_id_e1 if group_id_e1 else group_id_e2 if group_id_e2 else str(uuid.uuid4())
-                    new_interactions.append(Interaction([e1, e2], interaction_type="group_formed", metadata={"group_id": new_group_id}))
+                    new_group_id = group_id_e1 if group_id_e1 else group_id_e2 if group_id_e2 else next(_group_ids)
+                    new_interactions.append(Interaction([e1, e2], interaction_type=GROUP_FORMED, metadata={"group_id": new_group_id}))
                 else:
                     # They are already in the same group
                     pass
@@ -372,6 +1000,21 @@ def group_formation_rule(entities, interaction_threshold=2):
 persistent_pair = None
 persistent_interaction_count = 0
 
+def _persistent_step(entities, pair, count, max_interactions):
+    """
+    One step of the persistent interaction rule over explicit state.
+    Returns (interactions, pair, count) with the state to carry into the next step.
+    """
+    if len(entities) < 2: return None, pair, count
+
+    if pair is None:
+        pair = random.sample(entities, 2)
+        count = 0
+
+    if count < max_interactions:
+        return [Interaction(pair, interaction_type="persistent_bond")], pair, count + 1
+    return None, pair, count
+
 def persistent_interaction_rule(entities, max_interactions=5):
     """
     Rule: A specific pair of entities interacts repeatedly to demonstrate group formation.
@@ -379,18 +1022,25 @@ def persistent_interaction_rule(entities, max_interactions=5):
     the `group_formation_rule` for demonstration purposes.
     """
     global persistent_pair, persistent_interaction_count
+    interactions, persistent_pair, persistent_interaction_count = _persistent_step(
+        entities, persistent_pair, persistent_interaction_count, max_interactions)
+    return interactions
 
-    if len(entities) < 2: return None
+def make_persistent_interaction_rule(max_interactions=5):
+    """
+    Builds a `persistent_interaction_rule` with its own pair and count, kept in the closure
+    instead of module globals. Each universe can then run its own persistent pair.
+    """
+    pair = None
+    count = 0
 
-    if persistent_pair is None:
-        persistent_pair = random.sample(entities, 2)
-        persistent_interaction_count = 0
+    def rule(entities):
+        nonlocal pair, count
+        interactions, pair, count = _persistent_step(entities, pair, count, max_interactions)
+        return interactions
 
-    if persistent_interaction_count < max_interactions:
-        persistent_interaction_count += 1
-        return [Interaction(persistent_pair, interaction_type="persistent_bond")]
-    else:
-        return None
+    rule.__name__ = "persistent_interaction_rule"
+    return rule
 
 if __name__ == "__main__":
     """
@@ -414,7 +1064,7 @@ if __name__ == "__main__":
     universe.add_interaction_rule(gravity_rule) # Axiom IV
     universe.add_interaction_rule(fusion_rule) # Axiom I, Axiom II (emergence)
     universe.add_interaction_rule(group_formation_rule) # Axiom V
-    universe.add_interaction_rule(persistent_interaction_rule) # For guaranteed group formation demonstration
+    universe.add_interaction_rule(make_persistent_interaction_rule()) # For guaranteed group formation demonstration
 
     # 4. Run simulation
     print("Starting refined simulation with enhanced observer and group formation.")